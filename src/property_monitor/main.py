@@ -1,23 +1,35 @@
 """
 Module for monitoring and scraping properties from the Rightmove website in the UK.
 
-It leverages aiohttp for asynchronous HTTP requests, BeautifulSoup for HTML parsing,
-and sqlite3 to store property data in a local database.
+It leverages aiohttp for asynchronous HTTP requests, lxml with precompiled XPath for HTML parsing,
+and aiosqlite to store property data in a local database.
 The module includes functionalities for User-Agent rotation, exponential backoff retries,
-and robust logging.
+an on-disk HTTP cache and robust logging.
 """
 
 # Standard library imports
+import os
+import multiprocessing
 import random
 import asyncio
 import logging
-import sqlite3
+import math
 import csv
-from datetime import datetime
+import re
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from concurrent.futures import ProcessPoolExecutor
+from logging.handlers import QueueHandler, QueueListener
+from queue import Queue
 
 # Third-party library imports
 import aiohttp
-from bs4 import BeautifulSoup
+import aiosqlite
+import xxhash
+from aiolimiter import AsyncLimiter
+from diskcache import Cache
+from lxml import etree, html as lxml_html
 
 # Base URL for scraping. The `{}` is a placeholder for the pagination index.
 BASE_URL = "https://www.rightmove.co.uk/property-for-sale/find.html?locationIdentifier=REGION%5E87490&index={}"
@@ -32,126 +44,302 @@ USER_AGENTS = [
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 13_4; rv:115.0) Gecko/20100101 Firefox/115.0",
 ]
 
-# Configure the logging system. Messages will be written to 'output/log_scrape.log'.
-logging.basicConfig(
-    filename="output/log_scrape.log",  # Log file name
-    level=logging.INFO,  # Minimum level of messages to log (INFO, WARNING, ERROR, DEBUG)
-    format="%(asctime)s - %(levelname)s - %(message)s",  # Log message format
+# Columns of the 'properties' table. Duplicates are prevented with a UNIQUE constraint on an
+# integer hash of the link rather than on the full URL text, which keeps the index small and
+# makes each 'INSERT OR IGNORE' lookup an integer comparison.
+PROPERTIES_COLUMNS = """
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    price TEXT,
+    address TEXT,
+    description TEXT,
+    bedrooms TEXT,
+    link TEXT,
+    link_hash INTEGER UNIQUE,
+    scraped_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+"""
+
+# HTML parser for the raw page bytes. Rightmove serves UTF-8, so the encoding is fixed
+# rather than guessed (lxml would otherwise fall back to Latin-1 without a meta charset).
+HTML_PARSER = lxml_html.HTMLParser(encoding="utf-8")
+
+# Ready-to-use request headers, one per User-Agent, so fetch does not build a dict per request.
+USER_AGENT_HEADERS = tuple(
+    {
+        "User-Agent": ua,
+        "Accept": "text/html,application/xhtml+xml",
+        "Accept-Language": "en-GB,en;q=0.9",
+    }
+    for ua in USER_AGENTS
+)
+
+# XPath expressions used by parse_listings, compiled once at module load instead of per card.
+# Field classes are matched on their prefix, so a change in the generated hash suffix does not break them.
+CARD_XPATH = etree.XPath(
+    '//div[starts-with(@class, "PropertyCard_propertyCardContainer__")]'
+)
+PRICE_XPATH = etree.XPath('.//div[contains(@class, "PropertyPrice_price__")]')
+ADDRESS_XPATH = etree.XPath(
+    './/address[contains(@class, "PropertyAddress_address__")]'
+)
+DESCRIPTION_XPATH = etree.XPath(
+    './/p[contains(@class, "PropertyCardSummary_summary__")]'
 )
+BEDROOMS_XPATH = etree.XPath(
+    './/span[contains(@class, "PropertyInformation_bedroomsCount__")]'
+)
+LINK_XPATH = etree.XPath(
+    './/a[contains(concat(" ", normalize-space(@class), " "), " propertyCard-link ")]/@href',
+    smart_strings=False,
+)
+
+
+def setup_logging() -> QueueListener:
+    """
+    Configures the logging system. Messages will be written to 'output/log_scrape.log'.
+    Log calls still build the message on the calling thread (QueueHandler.prepare formats
+    it before enqueueing the record), but the file write moves to a background thread,
+    so logging never blocks the event loop on file I/O.
+
+    Returns:
+        QueueListener: The started listener; call stop() on shutdown to flush pending records.
+    """
+    log_queue = Queue(-1)  # Unbounded queue shared by the handler and the listener
+    file_handler = logging.FileHandler("output/log_scrape.log")  # Log file name
+    file_handler.setFormatter(
+        logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")  # Log message format
+    )
+    root_logger = logging.getLogger()
+    root_logger.addHandler(QueueHandler(log_queue))
+    # Minimum level of messages to log (INFO, WARNING, ERROR, DEBUG)
+    root_logger.setLevel(logging.INFO)
+    listener = QueueListener(log_queue, file_handler)
+    listener.start()
+    return listener
+
+
+# Token-bucket rate limiter: admits at most 3 requests per second to avoid overwhelming the server,
+# while concurrency is left to float within the connection pool.
+rate_limiter = AsyncLimiter(max_rate=3, time_period=1.0)
+
+# Markers of a captcha or block page, searched case-insensitively on the raw response bytes.
+BLOCK_PATTERN = re.compile(rb"captcha|blocked", re.IGNORECASE)
+
+# Directory of the on-disk HTTP cache keyed by URL, so repeated runs can skip re-downloading
+# unchanged pages. The cache is opened by scrape_and_save_properties, not at import time.
+HTTP_CACHE_DIR = "output/http_cache"
+# Cached pages younger than this many seconds are reused without contacting the server.
+CACHE_TTL = 3600
+
+# Upper bound (in seconds) for a server-provided Retry-After delay, so a bogus header cannot stall the run.
+MAX_RETRY_AFTER = 120
+# Smoothing factor of the moving average of throttled (429/503) responses.
+THROTTLE_EMA_ALPHA = 0.3
+# Throttling rate above which fetch proactively slows down before each request.
+THROTTLE_EMA_THRESHOLD = 0.2
+# Exponential moving average of throttled responses seen during the session (0 = none, 1 = all).
+throttle_rate = 0.0
+
+
+def record_throttle(throttled: bool) -> None:
+    """
+    Updates the moving average of throttled responses with the outcome of one request.
+
+    Args:
+        throttled (bool): Whether the server answered with 429 or 503.
+    """
+    global throttle_rate
+    throttle_rate = (
+        THROTTLE_EMA_ALPHA * throttled + (1 - THROTTLE_EMA_ALPHA) * throttle_rate
+    )
+
 
-# Limits the maximum number of concurrent HTTP requests to avoid overwhelming the server.
-semaphore = asyncio.Semaphore(5)
+def parse_retry_after(value: str | None) -> float | None:
+    """
+    Parses a Retry-After header, given either as delay seconds (digits only) or as an HTTP date.
+
+    Args:
+        value (str | None): The raw header value.
+
+    Returns:
+        float | None: The number of seconds to wait, capped at MAX_RETRY_AFTER,
+                      or None if the header is missing or invalid.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isascii() and value.isdigit():
+        seconds = int(value)
+    else:
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        seconds = (retry_at - datetime.now(timezone.utc)).total_seconds()
+    if not math.isfinite(seconds):
+        return None
+    return float(min(max(seconds, 0), MAX_RETRY_AFTER))
 
 
 async def fetch(
-    session: aiohttp.ClientSession, url: str, retries: int = 3
-) -> str | None:
+    session: aiohttp.ClientSession, http_cache: Cache, url: str, retries: int = 3
+) -> bytes | None:
     """
     Performs an HTTP GET request to a given URL, handling User-Agent rotation, retries, and backoff.
     Also checks for suspicious responses (e.g., captcha or blocks).
+    Pages are served from the on-disk cache while fresh, and revalidated with
+    If-None-Match / If-Modified-Since once they expire.
 
     Args:
         session (aiohttp.ClientSession): The aiohttp client session for HTTP requests.
+        http_cache (Cache): The on-disk cache of previously fetched pages.
         url (str): The URL from which to download content.
         retries (int): Maximum number of retries in case of failure.
 
     Returns:
-        str | None: The HTML content of the page as a string if the request is successful,
-                    otherwise None in case of errors or blocks.
+        bytes | None: The raw HTML content of the page if the request is successful,
+                      otherwise None in case of errors or blocks.
     """
-    async with semaphore:  # Acquire the semaphore before making the request
-        for attempt in range(1, retries + 1):
-            user_agent = random.choice(USER_AGENTS)  # Choose a random User-Agent
-            headers = {"User-Agent": user_agent}
-            try:
-                logging.info(
-                    f"[Attempt {attempt}] Scraping URL: {url} with User-Agent: {user_agent}"
-                )
-                async with session.get(url, headers=headers, timeout=15) as response:
-                    if response.status == 200:
-                        text = await response.text()
-                        # Basic check to detect blocks like captcha or too many requests
-                        if "captcha" in text.lower() or "blocked" in text.lower():
-                            logging.warning(f"Captcha/Block detected on {url}")
-                            return None
-                        return text
-                    elif response.status == 429:  # "Too Many Requests" status code
-                        logging.warning(f"429 Too Many Requests on {url}")
-                    else:
-                        logging.warning(
-                            f"HTTP {response.status} received for URL: {url}"
-                        )
-            except asyncio.TimeoutError:
-                logging.warning(f"Timeout on attempt {attempt} for URL: {url}")
-            except aiohttp.ClientError as e:
-                logging.error(f"Client error on attempt {attempt} for URL: {url}: {e}")
-            except Exception as e:
-                logging.error(
-                    f"Unexpected error on attempt {attempt} for URL: {url}: {e}"
-                )
+    cached = http_cache.get(url)
+    if cached and time.time() - cached["fetched_at"] < CACHE_TTL:
+        logging.info("Cache hit for URL: %s", url)
+        return cached["body"]
+
+    # Choose a random prebuilt set of headers once per URL and reuse it for every attempt
+    headers = random.choice(USER_AGENT_HEADERS)
+    if cached:
+        # Conditional request: the server answers 304 if the cached page is still valid.
+        # Copy the headers first: the prebuilt dicts are shared and must not be modified.
+        headers = dict(headers)
+        if cached["etag"]:
+            headers["If-None-Match"] = cached["etag"]
+        if cached["last_modified"]:
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    for attempt in range(1, retries + 1):
+        retry_after = None
+        if throttle_rate > THROTTLE_EMA_THRESHOLD:
+            # The server is throttling us: back off in proportion to the throttling rate
+            await asyncio.sleep(random.uniform(1, 3) * 4 * throttle_rate)
+        try:
+            # Lazy %-formatting: the message is only built if INFO is enabled
+            logging.info(
+                "[Attempt %d] Scraping URL: %s with User-Agent: %s",
+                attempt,
+                url,
+                headers["User-Agent"],
+            )
+            # Wait for a token from the rate limiter before sending the request
+            async with rate_limiter, session.get(url, headers=headers) as response:
+                record_throttle(response.status in (429, 503))
+                if response.status == 200:
+                    # Read the raw bytes: response.text() would run charset detection
+                    raw = await response.read()
+                    # Basic check to detect blocks like captcha or too many requests
+                    if BLOCK_PATTERN.search(raw):
+                        logging.warning("Captcha/Block detected on %s", url)
+                        return None
+                    http_cache.set(
+                        url,
+                        {
+                            "body": raw,
+                            "etag": response.headers.get("ETag"),
+                            "last_modified": response.headers.get("Last-Modified"),
+                            "fetched_at": time.time(),
+                        },
+                    )
+                    return raw
+                elif response.status == 304 and cached:  # "Not Modified"
+                    logging.info("Not modified, using cached page for URL: %s", url)
+                    http_cache.set(url, {**cached, "fetched_at": time.time()})
+                    return cached["body"]
+                elif response.status in (429, 503):  # "Too Many Requests" / "Service Unavailable"
+                    retry_after = parse_retry_after(
+                        response.headers.get("Retry-After")
+                    )
+                    logging.warning(
+                        "HTTP %d (throttled) on %s, Retry-After: %s",
+                        response.status,
+                        url,
+                        retry_after,
+                    )
+                else:
+                    logging.warning(
+                        "HTTP %d received for URL: %s", response.status, url
+                    )
+        except asyncio.TimeoutError:
+            logging.warning("Timeout on attempt %d for URL: %s", attempt, url)
+        except aiohttp.ClientError as e:
+            logging.error(
+                "Client error on attempt %d for URL: %s: %s", attempt, url, e
+            )
+        except Exception as e:
+            logging.error(
+                "Unexpected error on attempt %d for URL: %s: %s", attempt, url, e
+            )
 
+        if attempt == retries:
+            # No retry follows the last attempt, so there is nothing to wait for
+            break
+        if retry_after is not None:
+            # Honor the delay requested by the server
+            wait_time = retry_after
+        else:
             # Exponential backoff with random jitter to avoid predictable request patterns
             wait_time = (2**attempt) + random.uniform(0, 1)
-            logging.info(f"Waiting {wait_time:.2f} seconds before retry...")
-            await asyncio.sleep(wait_time)
+        logging.info("Waiting %.2f seconds before retry...", wait_time)
+        await asyncio.sleep(wait_time)
 
-        logging.error(f"Failed to retrieve URL after {retries} attempts: {url}")
-        return None
+    logging.error("Failed to retrieve URL after %d attempts: %s", retries, url)
+    return None
+
+
+def first_text(card: lxml_html.HtmlElement, xpath: etree.XPath) -> str | None:
+    """
+    Returns the stripped text of the first element matched by an XPath expression.
+
+    Args:
+        card (lxml.html.HtmlElement): The property card element to search in.
+        xpath (etree.XPath): The precompiled XPath expression to evaluate.
+
+    Returns:
+        str | None: The element's text content, or None if no element matches.
+    """
+    nodes = xpath(card)
+    return nodes[0].text_content().strip() if nodes else None
 
 
-def parse_listings(html: str) -> list[dict]:
+def parse_listings(html: bytes) -> list[dict]:
     """
     Parses the HTML content to extract property data.
+    The raw bytes are handed straight to lxml, avoiding a separate decode into a str copy.
 
     Args:
-        html (str): The HTML content of the page to parse.
+        html (bytes): The raw HTML content of the page to parse.
 
     Returns:
         list[dict]: A list of dictionaries, where each dictionary represents a property
                     with keys like 'price', 'address', 'description', 'bedrooms', 'link'.
     """
-    soup = BeautifulSoup(html, "html.parser")
+    try:
+        tree = lxml_html.fromstring(html, parser=HTML_PARSER)
+    except etree.ParserError:
+        # lxml raises on documents with no elements (e.g. whitespace or comments only)
+        return []
     # Selects all divs that represent a single property card using a class attribute starting with "PropertyCard_propertyCardContainer__"
-    listings = soup.select('div[class^="PropertyCard_propertyCardContainer__"]')
+    listings = CARD_XPATH(tree)
     data = []
 
     for card in listings:
-        price = None
-        address = None
-        description = None
-        bedrooms = None
-        full_link = None
+        # Missing fields come back as None, without raising and catching exceptions per field
+        price = first_text(card, PRICE_XPATH)
+        address = first_text(card, ADDRESS_XPATH)
+        description = first_text(card, DESCRIPTION_XPATH)
+        bedrooms = first_text(card, BEDROOMS_XPATH)
 
-        # Safe data extraction using try-except blocks to handle potentially missing elements
-        try:
-            price = card.select_one("div.PropertyPrice_price__VL65t").text.strip()
-        except AttributeError:
-            logging.debug("Price element not found for a card. Setting to None.")
-        try:
-            address = card.select_one(
-                "address.PropertyAddress_address__LYRPq"
-            ).text.strip()
-        except AttributeError:
-            logging.debug("Address element not found for a card. Setting to None.")
-        try:
-            description = card.select_one(
-                "p.PropertyCardSummary_summary__oIv57"
-            ).text.strip()
-        except AttributeError:
-            logging.debug("Description element not found for a card. Setting to None.")
-        try:
-            bedrooms = card.select_one(
-                "span.PropertyInformation_bedroomsCount___2b5R"
-            ).text.strip()
-        except AttributeError:
-            logging.debug("Bedrooms element not found for a card. Setting to None.")
-        try:
-            link = card.select_one("a.propertyCard-link")["href"]
-            full_link = "https://www.rightmove.co.uk" + link
-        except (AttributeError, TypeError, KeyError):
-            logging.debug(
-                "Link element not found or invalid for a card. Setting to None."
-            )
+        hrefs = LINK_XPATH(card)
+        full_link = "https://www.rightmove.co.uk" + hrefs[0] if hrefs else None
 
         data.append(
             {
@@ -166,27 +354,84 @@ def parse_listings(html: str) -> list[dict]:
     return data
 
 
-async def scrape_page(session: aiohttp.ClientSession, index: int) -> list[dict]:
+async def scrape_page(
+    session: aiohttp.ClientSession,
+    http_cache: Cache,
+    executor: ProcessPoolExecutor,
+    index: int,
+) -> list[dict]:
     """
     Scrapes a single page from the Rightmove website.
+    The download runs on the event loop, while parsing is offloaded to a worker process
+    so that CPU-bound parsing of different pages runs in parallel.
 
     Args:
         session (aiohttp.ClientSession): The aiohttp client session.
+        http_cache (Cache): The on-disk cache of previously fetched pages.
+        executor (ProcessPoolExecutor): The process pool used to parse the HTML.
         index (int): The starting index for properties on the page (e.g., 0, 24, 48...).
 
     Returns:
         list[dict]: A list of dictionaries containing the found property data.
     """
     url = BASE_URL.format(index)
-    html = await fetch(session, url)
-    # Add a random delay to avoid overwhelming the server and reduce the risk of being blocked
-    await asyncio.sleep(random.uniform(1, 3))
+    html = await fetch(session, http_cache, url)
     if html:
-        return parse_listings(html)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, parse_listings, html)
     else:
         return []
 
 
+def link_hash(link: str) -> int:
+    """
+    Computes the uniqueness key of a property link.
+
+    Args:
+        link (str): The full URL of the property.
+
+    Returns:
+        int: The 64-bit xxHash of the link, masked to fit a signed SQLite INTEGER.
+    """
+    return xxhash.xxh64_intdigest(link.encode("utf-8")) & 0x7FFFFFFFFFFFFFFF
+
+
+async def create_properties_table(db: aiosqlite.Connection) -> None:
+    """
+    Creates the 'properties' table if it doesn't exist, and migrates databases created
+    before the 'link_hash' column was introduced.
+
+    Args:
+        db (aiosqlite.Connection): The open database connection.
+    """
+    async with db.execute("PRAGMA table_info(properties)") as cursor:
+        columns = {row[1] for row in await cursor.fetchall()}
+
+    if not columns:
+        await db.execute(f"CREATE TABLE properties ({PROPERTIES_COLUMNS})")
+    elif "link_hash" not in columns:
+        # The UNIQUE constraint on 'link' cannot be dropped in place: rebuild the table once,
+        # computing the hash of every existing link.
+        logging.info("Migrating 'properties' table to the 'link_hash' uniqueness key.")
+        await db.create_function("link_hash", 1, link_hash, deterministic=True)
+        await db.execute("BEGIN")
+        try:
+            await db.execute(f"CREATE TABLE properties_new ({PROPERTIES_COLUMNS})")
+            await db.execute("""
+            INSERT OR IGNORE INTO properties_new
+                (id, price, address, description, bedrooms, link, link_hash, scraped_at)
+            SELECT id, price, address, description, bedrooms, link,
+                CASE WHEN link IS NULL THEN NULL ELSE link_hash(link) END, scraped_at
+            FROM properties
+            """)
+            await db.execute("DROP TABLE properties")
+            await db.execute("ALTER TABLE properties_new RENAME TO properties")
+            await db.execute("COMMIT")
+        except Exception:
+            await db.execute("ROLLBACK")
+            raise
+
+
 async def scrape_and_save_properties(pages: int = 10):
     """
     Main function that executes scraping of all requested pages in parallel.
@@ -199,99 +444,177 @@ async def scrape_and_save_properties(pages: int = 10):
     # Connect to SQLite DB. The path is updated for the new structure.
     # This path assumes the script is run from a location where 'data/property_listings.db' is accessible.
     db_path = "data/property_listings.db"  # Database file name updated as agreed
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-
-    # SQLite DB setup with a UNIQUE constraint on the 'link' column to prevent duplicate entries
-    cursor.execute("""
-    CREATE TABLE IF NOT EXISTS properties (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        price TEXT,
-        address TEXT,
-        description TEXT,
-        bedrooms TEXT,
-        link TEXT UNIQUE,
-        scraped_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )
-    """)
-    conn.commit()
-
-    async with aiohttp.ClientSession() as session:
-        # Create a list of tasks for scraping each page
-        tasks = [scrape_page(session, i * 24) for i in range(pages)]
-        results = await asyncio.gather(*tasks)  # Execute all tasks in parallel
-
-        total_inserted = 0
-        for page_data in results:
-            for prop in page_data:
-                if not prop[
-                    "link"
-                ]:  # Skip the property if the link is missing (essential for uniqueness)
-                    logging.warning(f"Skipping property due to missing link: {prop}")
-                    continue
-                try:
-                    # Insert the property into the DB. 'INSERT OR IGNORE' prevents duplicates based on the 'link' field.
-                    cursor.execute(
-                        """
-                        INSERT OR IGNORE INTO properties (price, address, description, bedrooms, link)
-                        VALUES (?, ?, ?, ?, ?)
-                    """,
-                        (
-                            prop["price"],
-                            prop["address"],
-                            prop["description"],
-                            prop["bedrooms"],
-                            prop["link"],
-                        ),
-                    )
-                    if (
-                        cursor.rowcount > 0
-                    ):  # rowcount > 0 indicates a row was inserted (not ignored)
-                        total_inserted += 1
-                except Exception as e:
-                    logging.error(
-                        f"Database insertion error for link {prop['link']}: {e}"
+    # Autocommit mode (isolation_level=None): transactions are opened explicitly with BEGIN.
+    # aiosqlite runs the single SQLite connection on its own thread, so inserts overlap with scraping.
+    db = await aiosqlite.connect(db_path, isolation_level=None)
+    try:
+        # WAL journal with relaxed syncing suits this single-writer scraper: one fsync per
+        # committed batch instead of per write, plus a larger page cache and memory-mapped reads.
+        await db.executescript("""
+        PRAGMA journal_mode=WAL;
+        PRAGMA synchronous=NORMAL;
+        PRAGMA temp_store=MEMORY;
+        PRAGMA cache_size=-64000;
+        PRAGMA mmap_size=268435456;
+        """)
+
+        await create_properties_table(db)
+
+        # Keep-alive connection pool (at most 5 connections), so TCP/TLS handshakes are reused
+        # across all page fetches and retries. The request timeout is set once on the session.
+        connector = aiohttp.TCPConnector(
+            limit=5, limit_per_host=5, ttl_dns_cache=300, keepalive_timeout=60
+        )
+        timeout = aiohttp.ClientTimeout(total=15)
+        # Workers are spawned rather than forked: the pool starts them lazily, when other threads
+        # (such as the DNS resolver's thread pool) may already be running, and forking a
+        # multi-threaded process is unsafe. Each spawned worker costs a fresh interpreter and
+        # module import, so the pool never starts more workers than there are pages to parse.
+        with (
+            ProcessPoolExecutor(
+                max_workers=max(1, min(os.cpu_count() or 1, pages)),
+                mp_context=multiprocessing.get_context("spawn"),
+            ) as executor,
+            Cache(HTTP_CACHE_DIR) as http_cache,
+        ):
+            async with aiohttp.ClientSession(
+                connector=connector, timeout=timeout
+            ) as session:
+                # Create a task for scraping each page
+                tasks = [
+                    asyncio.create_task(
+                        scrape_page(session, http_cache, executor, i * 24)
                     )
+                    for i in range(pages)
+                ]
 
-        conn.commit()  # Save changes to the database
-        logging.info(f"[✔] Saving completed: {total_inserted} new properties saved.")
+                total_inserted = 0
+                # One transaction for the whole run, so all batches share a single commit
+                await db.execute("BEGIN")
+                try:
+                    # Insert each page as soon as it is scraped instead of waiting for all pages
+                    for next_page in asyncio.as_completed(tasks):
+                        try:
+                            page_data = await next_page
+                        except Exception as e:
+                            # A failed page must not discard the rows of the pages that succeeded
+                            logging.error("Skipping page that failed to scrape: %r", e)
+                            continue
+                        rows = []
+                        for prop in page_data:
+                            # Skip the property if the link is missing (essential for uniqueness)
+                            if not prop["link"]:
+                                logging.warning(
+                                    f"Skipping property due to missing link: {prop}"
+                                )
+                                continue
+                            rows.append(
+                                (
+                                    prop["price"],
+                                    prop["address"],
+                                    prop["description"],
+                                    prop["bedrooms"],
+                                    prop["link"],
+                                    link_hash(prop["link"]),
+                                )
+                            )
+                        if not rows:
+                            continue
+                        try:
+                            # 'INSERT OR IGNORE' prevents duplicates based on the 'link_hash' field.
+                            cursor = await db.executemany(
+                                """
+                                INSERT OR IGNORE INTO properties (price, address, description, bedrooms, link, link_hash)
+                                VALUES (?, ?, ?, ?, ?, ?)
+                            """,
+                                rows,
+                            )
+                            # For executemany, rowcount is the number of rows actually inserted (not ignored)
+                            total_inserted += cursor.rowcount
+                        except Exception as e:
+                            logging.error(
+                                f"Database insertion error for batch of {len(rows)} rows: {e}"
+                            )
+                    await db.execute("COMMIT")
+                except Exception:
+                    # The write itself failed (e.g. COMMIT): stop the remaining pages and
+                    # discard this run's partial batch
+                    for task in tasks:
+                        task.cancel()
+                    if db.in_transaction:
+                        await db.execute("ROLLBACK")
+                    raise
 
-    # Generate CSV filename with current date (YYYY-MM-DD format)
-    csv_filename = (
-        f"output/rightmove_properties_{datetime.now().strftime('%Y-%m-%d')}.csv"
-    )
+                logging.info(
+                    f"[✔] Saving completed: {total_inserted} new properties saved."
+                )
 
-    # Export DB content to a CSV file
-    try:
-        cursor.execute(
-            "SELECT price, address, description, bedrooms, link, scraped_at FROM properties"
-        )
-        rows = cursor.fetchall()  # Retrieve all rows
-        with open(csv_filename, "w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow(
-                ["price", "address", "description", "bedrooms", "link", "scraped_at"]
-            )  # Write header row
-            writer.writerows(rows)  # Write all data rows
-        logging.info(
-            f"[✔] CSV export completed to '{csv_filename}' with {len(rows)} rows."
+        # Generate CSV filename with current date (YYYY-MM-DD format)
+        csv_filename = (
+            f"output/rightmove_properties_{datetime.now().strftime('%Y-%m-%d')}.csv"
         )
-    except Exception as e:
-        logging.error(f"[✘] Error during CSV export: {e}")
+
+        # Export DB content to a CSV file
+        try:
+            async with db.execute("SELECT MAX(scraped_at) FROM properties") as cursor:
+                (newest_scraped_at,) = await cursor.fetchone()
+            csv_is_current = False
+            if newest_scraped_at is not None and os.path.exists(csv_filename):
+                # scraped_at is stored by SQLite in UTC with one-second resolution, so the export
+                # is current only if it was written after the second of the newest row had ended.
+                newest_row_time = (
+                    datetime.strptime(newest_scraped_at, "%Y-%m-%d %H:%M:%S")
+                    .replace(tzinfo=timezone.utc)
+                    .timestamp()
+                )
+                csv_is_current = os.path.getmtime(csv_filename) >= newest_row_time + 1
+            if csv_is_current:
+                # No row was added since today's export was written, whether by this run or
+                # by any other writer: skip re-reading the whole table.
+                logging.info(
+                    f"[✔] No new properties, keeping the existing CSV export '{csv_filename}'."
+                )
+            else:
+                row_count = 0
+                # Write to a temporary file and move it into place, so an interrupted export
+                # never leaves a partial CSV behind that a later run would consider up to date.
+                tmp_filename = f"{csv_filename}.tmp"
+                with open(tmp_filename, "w", newline="", encoding="utf-8") as f:
+                    writer = csv.writer(f)
+                    writer.writerow(
+                        ["price", "address", "description", "bedrooms", "link", "scraped_at"]
+                    )  # Write header row
+                    async with db.execute(
+                        "SELECT price, address, description, bedrooms, link, scraped_at FROM properties"
+                    ) as cursor:
+                        # Stream rows in chunks instead of loading them all with fetchall()
+                        while rows := await cursor.fetchmany(1000):
+                            writer.writerows(rows)
+                            row_count += len(rows)
+                os.replace(tmp_filename, csv_filename)
+                logging.info(
+                    f"[✔] CSV export completed to '{csv_filename}' with {row_count} rows."
+                )
+        except Exception as e:
+            logging.error(f"[✘] Error during CSV export: {e}")
 
     finally:
-        conn.close()  # Close the database connection even if an error occurs
+        await db.close()  # Close the database connection even if an error occurs
         logging.info("Database connection closed.")
         logging.info("Script finished.")
         print("Script completed. Check the log file for details.")
 
 
 if __name__ == "__main__":
-    start_time = datetime.now()
-    logging.info(f"Script started at {start_time}")
+    log_listener = setup_logging()
+    try:
+        start_time = datetime.now()
+        logging.info(f"Script started at {start_time}")
 
-    pages_to_scrape = 20  # Number of pages to scrape
-    asyncio.run(scrape_and_save_properties(pages=pages_to_scrape))
+        pages_to_scrape = 20  # Number of pages to scrape
+        asyncio.run(scrape_and_save_properties(pages=pages_to_scrape))
 
-    end_time = datetime.now()
-    logging.info(f"Script ended at {end_time} (Duration: {end_time - start_time})")
+        end_time = datetime.now()
+        logging.info(f"Script ended at {end_time} (Duration: {end_time - start_time})")
+    finally:
+        log_listener.stop()  # Flush queued records and stop the background thread
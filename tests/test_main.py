@@ -0,0 +1,323 @@
+"""
+Smoke test for the scraping pipeline, run end to end against a local HTTP server.
+"""
+
+# Standard library imports
+import asyncio
+import csv
+import importlib
+import os
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Third-party library imports
+import aiohttp
+import aiosqlite
+import pytest
+from aiohttp import web
+from diskcache import Cache
+
+# The package is not installed, so make 'src/' importable.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+# A search results page with two property cards, the second one without a link.
+LISTINGS_PAGE = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>Properties for sale</title></head>
+<body>
+  <div class="PropertyCard_propertyCardContainer__abc12">
+    <a class="propertyCard-link" href="/properties/123456">
+      <div class="PropertyPrice_price__VL65t">£250,000</div>
+    </a>
+    <address class="PropertyAddress_address__LYRPq">1 High Street, London</address>
+    <p class="PropertyCardSummary_summary__oIv57">A bright two bedroom flat.</p>
+    <span class="PropertyInformation_bedroomsCount___2b5R">2</span>
+  </div>
+  <div class="PropertyCard_propertyCardContainer__abc12">
+    <div class="PropertyPrice_price__VL65t">£300,000</div>
+  </div>
+</body>
+</html>
+"""
+
+
+@pytest.fixture
+def main(tmp_path, monkeypatch):
+    """
+    Imports the scraper module with the working directory set to an empty project layout.
+    """
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data").mkdir()
+    (tmp_path / "output").mkdir()
+    return importlib.import_module("property_monitor.main")
+
+
+async def serve_and_scrape(main, monkeypatch, pages: int, body: str) -> None:
+    """
+    Starts a local server returning the given page body and runs the full scrape against it.
+    """
+
+    async def listings(request: web.Request) -> web.Response:
+        return web.Response(text=body, content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/find.html", listings)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    try:
+        host, port = runner.addresses[0][:2]
+        monkeypatch.setattr(main, "BASE_URL", f"http://{host}:{port}/find.html?index={{}}")
+        await main.scrape_and_save_properties(pages=pages)
+    finally:
+        await runner.cleanup()
+
+
+def test_scrape_and_save_properties_end_to_end(main, monkeypatch, tmp_path):
+    asyncio.run(serve_and_scrape(main, monkeypatch, pages=2, body=LISTINGS_PAGE))
+
+    conn = sqlite3.connect(tmp_path / "data" / "property_listings.db")
+    try:
+        rows = conn.execute(
+            "SELECT price, address, description, bedrooms, link FROM properties"
+        ).fetchall()
+    finally:
+        conn.close()
+    # Both pages return the same card, and the card without a link is skipped.
+    assert rows == [
+        (
+            "£250,000",
+            "1 High Street, London",
+            "A bright two bedroom flat.",
+            "2",
+            "https://www.rightmove.co.uk/properties/123456",
+        )
+    ]
+
+    csv_files = list((tmp_path / "output").glob("rightmove_properties_*.csv"))
+    assert len(csv_files) == 1
+    with open(csv_files[0], newline="", encoding="utf-8") as f:
+        exported = list(csv.reader(f))
+    assert exported[0] == [
+        "price",
+        "address",
+        "description",
+        "bedrooms",
+        "link",
+        "scraped_at",
+    ]
+    assert len(exported) == 2
+
+
+def test_scrape_and_save_properties_keeps_good_pages_when_one_fails(
+    main, monkeypatch, tmp_path
+):
+    scrape_page = main.scrape_page
+
+    async def failing_first_page(session, http_cache, executor, index):
+        if index == 0:
+            raise ValueError("bad page")
+        return await scrape_page(session, http_cache, executor, index)
+
+    monkeypatch.setattr(main, "scrape_page", failing_first_page)
+    asyncio.run(serve_and_scrape(main, monkeypatch, pages=2, body=LISTINGS_PAGE))
+
+    # The aiosqlite worker thread must stop, otherwise the interpreter never exits.
+    for thread in threading.enumerate():
+        if thread is not threading.main_thread():
+            thread.join(timeout=5)
+            assert not thread.is_alive(), f"Thread still running: {thread!r}"
+
+    # The failed page is skipped, and the rows of the good page are committed.
+    conn = sqlite3.connect(tmp_path / "data" / "property_listings.db")
+    try:
+        assert not conn.in_transaction
+        assert conn.execute("SELECT link FROM properties").fetchall() == [
+            ("https://www.rightmove.co.uk/properties/123456",)
+        ]
+    finally:
+        conn.close()
+
+
+def test_scrape_and_save_properties_keeps_csv_newer_than_the_newest_row(
+    main, monkeypatch, tmp_path
+):
+    asyncio.run(serve_and_scrape(main, monkeypatch, pages=1, body=LISTINGS_PAGE))
+    (csv_file,) = (tmp_path / "output").glob("rightmove_properties_*.csv")
+
+    # The export was written after the newest row, so the second run leaves it alone.
+    csv_file.write_text("kept\n", encoding="utf-8")
+    later = time.time() + 5
+    os.utime(csv_file, (later, later))
+    asyncio.run(serve_and_scrape(main, monkeypatch, pages=1, body=LISTINGS_PAGE))
+    assert csv_file.read_text(encoding="utf-8") == "kept\n"
+
+    # An export older than the newest row is written again.
+    os.utime(csv_file, (0, 0))
+    asyncio.run(serve_and_scrape(main, monkeypatch, pages=1, body=LISTINGS_PAGE))
+    with open(csv_file, newline="", encoding="utf-8") as f:
+        assert len(list(csv.reader(f))) == 2
+
+
+@pytest.mark.parametrize("html", [b"", b"   ", b"<!-- nothing here -->"])
+def test_parse_listings_returns_nothing_for_empty_documents(main, html):
+    assert main.parse_listings(html) == []
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("5", 5.0),
+        (" 30 ", 30.0),
+        ("100000", 120.0),  # Capped at MAX_RETRY_AFTER
+        ("Wed, 21 Oct 2015 07:28:00 GMT", 0.0),  # A date in the past means no wait
+        (None, None),
+        ("", None),
+        ("nan", None),
+        ("inf", None),
+        ("1e3", None),
+        ("-5", None),
+        ("soon", None),
+    ],
+)
+def test_parse_retry_after(main, value, expected):
+    assert main.parse_retry_after(value) == expected
+
+
+async def serve_and_fetch(main, tmp_path, handler, times: int, retries: int = 3) -> list:
+    """
+    Starts a local server with the given page handler and fetches the page repeatedly,
+    sharing one session and one HTTP cache across the fetches.
+    """
+    app = web.Application()
+    app.router.add_get("/find.html", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    try:
+        host, port = runner.addresses[0][:2]
+        url = f"http://{host}:{port}/find.html"
+        async with aiohttp.ClientSession() as session:
+            with Cache(str(tmp_path / "http_cache")) as http_cache:
+                return [
+                    await main.fetch(session, http_cache, url, retries=retries)
+                    for _ in range(times)
+                ]
+    finally:
+        await runner.cleanup()
+
+
+def test_fetch_does_not_wait_after_the_last_attempt(main, tmp_path):
+    async def unavailable(request: web.Request) -> web.Response:
+        return web.Response(status=500)
+
+    started = time.monotonic()
+    results = asyncio.run(serve_and_fetch(main, tmp_path, unavailable, times=1, retries=1))
+    assert results == [None]
+    # The backoff before a retry is at least 2 seconds, and no retry follows the last attempt.
+    assert time.monotonic() - started < 2
+
+
+def etag_handler(seen_etags: list):
+    """
+    Returns a page handler that serves LISTINGS_PAGE with an ETag and answers 304 to a
+    matching If-None-Match, recording the If-None-Match header of every request.
+    """
+
+    async def listings(request: web.Request) -> web.Response:
+        seen_etags.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return web.Response(status=304, headers={"ETag": '"v1"'})
+        return web.Response(
+            text=LISTINGS_PAGE, content_type="text/html", headers={"ETag": '"v1"'}
+        )
+
+    return listings
+
+
+def test_fetch_serves_fresh_pages_from_the_cache(main, tmp_path):
+    seen_etags = []
+    results = asyncio.run(serve_and_fetch(main, tmp_path, etag_handler(seen_etags), times=2))
+
+    # The second fetch is answered from the cache without a request.
+    assert results == [LISTINGS_PAGE.encode(), LISTINGS_PAGE.encode()]
+    assert seen_etags == [None]
+
+
+def test_fetch_revalidates_expired_pages_with_etag(main, monkeypatch, tmp_path):
+    # Every cached page is expired, so each fetch after the first is a conditional request
+    monkeypatch.setattr(main, "CACHE_TTL", 0)
+    seen_etags = []
+    results = asyncio.run(serve_and_fetch(main, tmp_path, etag_handler(seen_etags), times=2))
+
+    # The server answers 304 without a body, and the cached body is reused.
+    assert seen_etags == [None, '"v1"']
+    assert results == [LISTINGS_PAGE.encode(), LISTINGS_PAGE.encode()]
+
+
+def test_create_properties_table_migrates_link_unique_schema(main, tmp_path):
+    db_path = tmp_path / "data" / "property_listings.db"
+    link_1 = "https://www.rightmove.co.uk/properties/1"
+    link_3 = "https://www.rightmove.co.uk/properties/3"
+    old_rows = [
+        (7, "£1", "a", "d1", "1", link_1, "2024-01-01 10:00:00"),
+        (9, "£2", "b", "d2", "2", None, "2024-01-02 11:00:00"),
+        (12, "£3", "c", "d3", "3", link_3, "2024-01-03 12:00:00"),
+    ]
+    conn = sqlite3.connect(db_path)
+    try:
+        # The schema used before 'link_hash' was introduced
+        conn.execute("""
+        CREATE TABLE properties (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            price TEXT,
+            address TEXT,
+            description TEXT,
+            bedrooms TEXT,
+            link TEXT UNIQUE,
+            scraped_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """)
+        conn.executemany("INSERT INTO properties VALUES (?, ?, ?, ?, ?, ?, ?)", old_rows)
+        conn.commit()
+    finally:
+        conn.close()
+
+    async def migrate_and_insert_duplicate() -> int:
+        async with aiosqlite.connect(db_path, isolation_level=None) as db:
+            await main.create_properties_table(db)
+            cursor = await db.execute(
+                """
+                INSERT OR IGNORE INTO properties (price, address, description, bedrooms, link, link_hash)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                ("£4", "d", "d4", "4", link_3, main.link_hash(link_3)),
+            )
+            return cursor.rowcount
+
+    # An existing link is still recognised as a duplicate after the migration.
+    assert asyncio.run(migrate_and_insert_duplicate()) == 0
+
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute(
+            "SELECT id, price, address, description, bedrooms, link, scraped_at, link_hash"
+            " FROM properties ORDER BY id"
+        ).fetchall()
+    finally:
+        conn.close()
+    # Ids, timestamps and links are preserved, and the hash is filled in for every link.
+    assert [row[:7] for row in rows] == old_rows
+    assert [row[7] for row in rows] == [
+        main.link_hash(row[5]) if row[5] is not None else None for row in old_rows
+    ]
+
+
+def test_import_has_no_filesystem_side_effects(main, tmp_path):
+    importlib.reload(main)
+    assert not (tmp_path / "output" / "http_cache").exists()